@@ -0,0 +1,154 @@
+"""
+SBOM processing loops.
+
+This module is kept free of I/O so it can be compiled ahead of time with
+mypyc, from the repository root: ``mypyc --follow-imports=silent src/_core.py``.
+main imports the compiled extension when it is present and the pure-Python
+module otherwise.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from sys import intern
+from typing import Optional
+
+@dataclass(slots=True)
+class Component:
+    """Processed CycloneDX component."""
+    type: str
+    name: str
+    version: str
+    ref: str = ''
+    purl: str = ''
+    dependencies: list[dict] = field(default_factory=list)
+
+@dataclass(slots=True)
+class SpdxPackage:
+    """Processed SPDX package."""
+    name: str
+    version: str
+    supplier: str
+    download_location: str
+    files_analyzed: bool
+    license_concluded: str
+    license_declared: str
+    dependencies: list[dict] = field(default_factory=list)
+
+def project_cyclonedx_component(component: dict) -> Component:
+    """
+    Project a CycloneDX component onto the fields used for processing.
+    Args:
+        component (dict): CycloneDX component.
+    Returns:
+        Component: Processed dependency.
+    """
+    get = component.get
+    component_type = get('type') or 'library'
+    return Component(
+        # Only a few distinct component types exist, so share one string object per type
+        type=intern(component_type) if isinstance(component_type, str) else 'library',
+        name=get('name', ''),
+        version=get('version', ''),
+        ref=get('bom-ref', ''),
+        purl=get('purl', '')
+    )
+
+def link_dependencies(components: list[Component], dependency_entries: list[dict]) -> None:
+    """
+    Link a CycloneDX dependency graph onto processed components.
+    Args:
+        components (list of Component): Processed dependencies, updated in place.
+        dependency_entries (list of dict): Entries of the SBOM's 'dependencies' section.
+    """
+    by_ref = {d.ref: d for d in components if d.ref}
+    by_purl = {d.purl: d for d in components if d.purl}
+    by_name = {d.name: d for d in components}
+
+    def find(ref: str) -> Optional[Component]:
+        return by_ref.get(ref) or by_purl.get(ref) or by_name.get(ref)
+
+    for dep in dependency_entries:
+        target = find(dep.get('ref', ''))
+        if target:
+            for ref in dep.get('dependsOn', []):
+                depends_on = find(ref)
+                if depends_on:
+                    target.dependencies.append({'name': depends_on.name, 'version': depends_on.version})
+                else:
+                    target.dependencies.append({'name': ref})
+
+def process_cyclonedx_sbom(sbom: dict) -> list[Component]:
+    """
+    Process CycloneDX SBOM in JSON format
+    Args:
+        sbom (dict): Parsed SBOM data
+    Returns:
+        list of Component: Processed dependencies.
+    """
+    dependencies: list[Component] = []
+
+    append = dependencies.append
+
+    def process_item(item: dict) -> None:
+        if 'components' in item:
+            # print(f"Components found:")
+            # print(item['components'])
+
+            for library_item in item['components']:
+                library_name = library_item.get('name', '')
+
+                if library_name:
+                    print(f"Package Name: {library_name}")
+
+                    append(project_cyclonedx_component(library_item))
+
+    # Walk the nested 'items' depth first with an explicit stack, so deep SBOMs cannot hit the recursion limit
+    stack = deque([sbom])
+    # Items shared between parents, or reachable through a cycle, are processed only once
+    seen: set[int] = set()
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        process_item(item)
+        if 'items' in item:
+            # Reversed so items are still processed in document order
+            stack.extend(reversed(item['items']))
+
+    # Link the top-level dependency graph onto the processed components
+    if 'dependencies' in sbom:
+        link_dependencies(dependencies, sbom['dependencies'])
+
+    print("CycloneDX SBOM Processed")
+    # print(dependencies)
+    return dependencies
+
+def process_spdx_sbom(sbom: dict) -> list[SpdxPackage]:
+    """
+    Process SPDX SBOM in JSON format
+    Args:
+        sbom (dict): Parsed SBOM data
+    Returns:
+        list of SpdxPackage: Processed dependencies.
+    """
+    dependencies: list[SpdxPackage] = []
+
+    # SPDX SBOMs have a 'packages' section listing all components
+    if 'packages' in sbom:
+        append = dependencies.append
+        for package in sbom['packages']:
+            get = package.get
+            # Positional arguments in SpdxPackage field order; keyword matching costs more per package
+            dep_info = SpdxPackage(
+                get('name', 'Unknown'),
+                get('versionInfo', 'Unknown'),
+                get('supplier', 'Unknown'),
+                get('downloadLocation', 'Unknown'),
+                get('filesAnalyzed', False),
+                get('licenseConcluded', 'Unknown'),
+                get('licenseDeclared', 'Unknown'),
+                # Add more fields as necessary
+            )
+            append(dep_info)
+
+    return dependencies
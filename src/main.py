@@ -1,109 +1,316 @@
 import argparse
-import jsonschema
+import atexit
+import concurrent.futures
 import json
 import csv
+import dataclasses
+import functools
+import importlib.util
+import itertools
+import mmap
 import os
-import pandas as pd
-import xml.etree.ElementTree as ET 
-from graphviz import Digraph
+import shutil
+import sqlite3
+import sys
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
+from urllib3.util.retry import Retry
+from contextlib import closing
+from email.utils import formatdate
+
+# The SBOM processing loops live in _core so they can be compiled with mypyc
+try:
+    from src._core import Component, link_dependencies, project_cyclonedx_component, process_cyclonedx_sbom, process_spdx_sbom
+except ImportError:
+    from _core import Component, link_dependencies, project_cyclonedx_component, process_cyclonedx_sbom, process_spdx_sbom
+
+# Upper bound on concurrent vulnerability lookups
+MAX_VULNERABILITY_WORKERS = 32
+
+# Timeout in seconds for schema downloads and vulnerability lookups
+REQUEST_TIMEOUT = 5
+
+# On-disk cache of vulnerability lookups, keyed by library name and version
+VULNERABILITY_CACHE_FILE = '.vuln_cache.sqlite'
+VULNERABILITY_CACHE_TTL = 24 * 60 * 60
+
+# JSON SBOMs at least this large are memory-mapped instead of read into a buffer
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# Columns written by convert_sbom_to_csv and the number of rows handed to each writerows call
+CSV_FIELDNAMES = ['name', 'version', 'type', 'description', 'licenses']
+CSV_BATCH_SIZE = 1024
+
+# URL and local file for the CycloneDX and SPDX schemas
+SCHEMA_URLS = {
+    'cyclonedx': "https://cyclonedx.org/schema/bom-1.5.schema.json",
+    'spdx': "https://raw.githubusercontent.com/spdx/spdx-spec/development/v2.3.1/schemas/spdx-schema.json"
+}
+SCHEMA_FILES = {
+    'cyclonedx': "schema_cyclonedx.json",
+    'spdx': "schema_spdx.json"
+}
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    # libxml2 parses in C. SBOMs are untrusted input, so entities are never expanded and nothing is fetched
+    from lxml import etree as ET
+    _XML_OPTIONS = {'resolve_entities': False, 'no_network': True}
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _XML_OPTIONS = {}
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+else:
+    # http2=True needs the h2 package as well; httpx imports it itself when the client is built
+    if importlib.util.find_spec('h2') is None:
+        httpx = None
+
+if httpx is not None:
+    # InvalidURL and StreamError sit outside httpx.HTTPError; requests reports the same inputs as RequestException
+    _HTTP_ERRORS = (requests.RequestException, httpx.HTTPError, httpx.InvalidURL, httpx.StreamError, ValueError)
+else:
+    _HTTP_ERRORS = (requests.RequestException, ValueError)
+
+# Per-thread sessions so schema downloads and vulnerability lookups reuse keep-alive connections
+_thread_local = threading.local()
+
+def _get_session():
+    # requests.Session is not guaranteed to be thread-safe, so each worker thread keeps its own
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+        session.mount('https://', HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.2)))
+    return session
+
+_http2_client = None
+_http2_lock = threading.Lock()
+
+def _get_client():
+    # With httpx available, every worker thread multiplexes its lookups as streams over one shared
+    # HTTP/2 connection instead of holding its own HTTP/1.1 connection; httpx.Client is thread-safe
+    global _http2_client
+    if httpx is None:
+        return _get_session()
+    with _http2_lock:
+        if _http2_client is None:
+            # Client ignores its own http2 and limits arguments when given a transport, so both go here
+            _http2_client = httpx.Client(transport=httpx.HTTPTransport(
+                http2=True, retries=3, limits=httpx.Limits(max_connections=MAX_VULNERABILITY_WORKERS)))
+            atexit.register(_http2_client.close)
+    return _http2_client
+
+def _license_ids(component):
+    ids = []
+    for entry in component.get('licenses', ()):
+        license_info = entry.get('license')
+        if license_info:
+            ids.append(license_info.get('id') or license_info.get('name', ''))
+        elif 'expression' in entry:
+            ids.append(entry['expression'])
+    return ','.join(ids)
+
+def _csv_row(component):
+    get = component.get
+    return {
+        'name': get('name', ''),
+        'version': get('version', ''),
+        'type': get('type', ''),
+        'description': get('description', ''),
+        'licenses': _license_ids(component)
+    }
+
+def _spdx_csv_row(package):
+    get = package.get
+    return {
+        'name': get('name', ''),
+        'version': get('versionInfo', ''),
+        'type': get('primaryPackagePurpose', ''),
+        'description': get('description', ''),
+        'licenses': get('licenseConcluded') or get('licenseDeclared', '')
+    }
+
+def _xml_csv_row(component, prefix):
+    def text(path):
+        return (component.findtext(prefix + path) or '').strip()
+
+    ids = []
+    for entry in component.iterfind(f'{prefix}licenses/*'):
+        if entry.tag == f'{prefix}license':
+            ids.append((entry.findtext(f'{prefix}id') or entry.findtext(f'{prefix}name') or '').strip())
+        elif entry.tag == f'{prefix}expression':
+            ids.append((entry.text or '').strip())
+    return {
+        'name': text('name'),
+        'version': text('version'),
+        'type': component.get('type', ''),
+        'description': text('description'),
+        'licenses': ','.join(ids)
+    }
+
+def _xml_csv_rows(root):
+    namespace, _, _ = root.tag.rpartition('}')
+    prefix = namespace + '}' if namespace else ''
+    for component in root.iterfind(f'{prefix}components/{prefix}component'):
+        yield _xml_csv_row(component, prefix)
 
 def convert_sbom_to_csv(sbom_data, csv_output_path):
     """Convert SBOM data to a CSV file.
 
     Args:
-        sbom_data (dict): The SBOM data in dictionary format.
+        sbom_data (dict, Element or list): The CycloneDX or SPDX SBOM data in dictionary format, the root
+            element of a CycloneDX XML SBOM, or a list of components.
         csv_output_path (str): The path where the CSV output will be saved.
     """
 
+    if ET.iselement(sbom_data):
+        rows = _xml_csv_rows(sbom_data)
+    elif isinstance(sbom_data, dict) and 'packages' in sbom_data:
+        rows = map(_spdx_csv_row, sbom_data['packages'])
+    elif isinstance(sbom_data, dict):
+        rows = map(_csv_row, sbom_data.get('components', []))
+    else:
+        rows = map(_csv_row, sbom_data)
+
     try:
-        df = pd.DataFrame(sbom_data)
-        df.to_csv(csv_output_path, index=False)
+        with open(csv_output_path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as file:
+            writer = csv.DictWriter(file, fieldnames=CSV_FIELDNAMES)
+            writer.writeheader()
+            # Hand rows to the writer in batches so large SBOMs never hold every row at once
+            while True:
+                batch = list(itertools.islice(rows, CSV_BATCH_SIZE))
+                if not batch:
+                    break
+                writer.writerows(batch)
         print(f"CSV file saved as {csv_output_path}")
     except Exception as e:
         print(f"Error while converting SBOM to CSV: {e}")
 
 def download_schema(url, file_name):
 
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            with open(file_name, 'w') as file:
-                file.write(response.text)
-            return file_name
+    # Revalidate a cached schema so an unchanged one costs a 304 with no body
+    etag_file = f'{file_name}.etag'
+    headers = {}
+    if os.path.exists(file_name):
+        if os.path.exists(etag_file):
+            with open(etag_file, 'r') as file:
+                headers['If-None-Match'] = file.read().strip()
         else:
-            return f"Error: Unable to download the schema. HTTP status code: {response.status_code}"
+            headers['If-Modified-Since'] = formatdate(os.path.getmtime(file_name), usegmt=True)
+
+    part_file = f'{file_name}.part'
+    try:
+        # Closing the streamed response hands its connection back to the session pool on every path
+        with _get_session().get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code == 304:
+                return file_name
+            elif response.status_code == 200:
+                # Stream the body to disk, then swap it in so an interrupted download never replaces a good schema
+                response.raw.decode_content = True
+                try:
+                    with open(part_file, 'wb') as file:
+                        shutil.copyfileobj(response.raw, file)
+                    os.replace(part_file, file_name)
+                except BaseException:
+                    if os.path.exists(part_file):
+                        os.remove(part_file)
+                    raise
+                etag = response.headers.get('ETag')
+                if etag:
+                    with open(etag_file, 'w') as file:
+                        file.write(etag)
+                elif os.path.exists(etag_file):
+                    os.remove(etag_file)
+                return file_name
+            else:
+                return f"Error: Unable to download the schema. HTTP status code: {response.status_code}"
     except Exception as e:
         return f"Error: {e}"
-    
-def process_cyclonedx_sbom(sbom):
-    """
-    Process CycloneDX SBOM in JSON format
-    Args:
-        sbom (dict): Parsed SBOM data
-    Returns:
-        list of dict: Processed dependencies.
-    """
-    dependencies = []
 
-    def process_item(item):
-        if 'components' in item:
-            # print(f"Components found:")
-            # print(item['components'])
-
-            for library_item in item['components']:
-                library_name = library_item.get('name', '')
-
-                if library_name:
-                    print(f"Package Name: {library_name}")
-
-                    dependencies.append({
-                        'type': 'library',
-                        'name': library_name,
-                        'version': library_item.get('verson', ''),
-                        'dependencies': []
-                    })
-                #library_version = library_item.get('version', '')
-                #library_components = library_item.get('components', [])
-
-                # dep_info = {
-                #     'type': 'library',
-                #     'name': library_name,
-                #     'version': library_version,
-                #     'dependencies': []
-                # }
-
-                # for component in library_components:
-                #     dep_info['dependencies'].append({
-                #         'type': 'library',
-                #         'name': component.get('name', ''),
-                #         'version': component.get('version', '')
-                #     })
-
-                # dependencies.append(dep_info)
-
-    def traverse_sbom(sbom_item):
-        if 'items' in sbom_item:
-            for item in sbom_item['items']:
-                process_item(item)
-                traverse_sbom(item)
-
-    traverse_sbom(sbom)
-
-    print("CycloneDX SBOM Processed")
-    # print(dependencies)
-    return dependencies
+# Parsed once and shared by the compiled and jsonschema validators; callers must not mutate it
+@functools.lru_cache(maxsize=8)
+def _load_schema(schema_file):
+    with open(schema_file, 'rb') as file:
+        return _loads(file.read())
+
+@functools.lru_cache(maxsize=8)
+def _compile_schema(schema_file, definition=None):
+    # Generate a validator specialized to the schema once, rather than walking the schema on every validation
+    schema = _load_schema(schema_file)
+
+    if definition is not None:
+        # Validate against a single definition, keeping the others so its local $refs still resolve
+        schema = {key: schema[key] for key in ('$schema', '$id', 'definitions') if key in schema}
+        schema['$ref'] = f'#/definitions/{definition}'
+
+    try:
+        return fastjsonschema.compile(schema)
+    except (fastjsonschema.JsonSchemaDefinitionException, OSError) as e:
+        # Remote $refs could not be resolved; callers fall back to jsonschema or skip validation
+        print(f"Unable to compile schema '{schema_file}': {e}")
+        return None
+
+@functools.lru_cache(maxsize=8)
+def _jsonschema_validator(schema_file):
+    # Imported here: jsonschema is the slowest import and only needed when fastjsonschema is unavailable
+    import jsonschema
+
+    # Check the schema and pick its draft once; jsonschema.validate redoes both on every call
+    schema = _load_schema(schema_file)
+
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
 
 def validate_sbom(sbom, schema_file):
 
-    with open(schema_file, 'r') as file:
-        schema = json.load(file)
+    validator = _compile_schema(schema_file) if fastjsonschema is not None else None
+    if validator is not None:
+        try:
+            validator(sbom)
+        except fastjsonschema.JsonSchemaException as e:
+            print(f"Validation error: {e}")
+        return
+
+    import jsonschema
+    try:
+        from referencing.exceptions import Unresolvable
+    except ImportError:
+        # jsonschema releases before 4.18 report unresolvable $refs with their own exception
+        Unresolvable = jsonschema.exceptions.RefResolutionError
 
     try:
-        jsonschema.validate(instance=sbom, schema=schema)
+        _jsonschema_validator(schema_file).validate(sbom)
     except jsonschema.exceptions.ValidationError as e:
         print(f"Validation error: {e}")
+    except Unresolvable as e:
+        # Typically a remote $ref while offline; the fastjsonschema compile above fails on the same ref
+        print(f"Skipping validation, unable to resolve a reference in '{schema_file}': {e}")
+
+# Adding a format means adding its processor here
+_PROCESSORS = {'cyclonedx': process_cyclonedx_sbom, 'spdx': process_spdx_sbom}
 
 def process_sbom(sbom, sbom_format):
     """
@@ -117,192 +324,422 @@ def process_sbom(sbom, sbom_format):
     Process the SBOM data to extract necessary information for dependency tree and vulnerability checks.
     This implementation assumes a certain structure of the SBOM. You may need to modify it based on your SBOM format.
     """
-    if sbom_format == 'cyclonedx':
-        dependencies = process_cyclonedx_sbom(sbom)
-    elif sbom_format == 'spdx':
-        # Process SPDX format
-        dependencies = process_spdx_sbom(sbom)
-    else:
-        dependencies = []
-    
-    return dependencies
-
-def process_spdx_sbom(sbom):
-    """
-    Process SPDX SBOM in JSON format
-    Args:
-        sbom (dict): Parsed SBOM data
-    Returns:
-        list of dict: Processed dependencies.
-    """
-    dependencies = []
-
-    # SPDX SBOMs have a 'packages' section listing all components
-    if 'packages' in sbom:
-        for package in sbom['packages']:
-            dep_info = {
-                'name': package.get('name', 'Unknown'),
-                'version': package.get('versionInfo', 'Unknown'),
-                'supplier': package.get('supplier', 'Unknown'),
-                'downloadLocation': package.get('downloadLocation', 'Unknown'),
-                'filesAnalyzed': package.get('filesAnalyzed', False),
-                'licenseConcluded': package.get('licenseConcluded', 'Unknown'),
-                'licenseDeclared': package.get('licenseDeclared', 'Unknown'),
-                # Add more fields as necessary
-            }
-            dependencies.append(dep_info)
-
-    return dependencies
+    return _PROCESSORS.get(sbom_format, lambda _: [])(sbom)
 
 def get_file_type(file_path):
     _, file_extension = os.path.splitext(file_path)
     return file_extension.lower()
 
 def parse_sbom_json(file_path):
-    with open(file_path, 'r') as file:
-        sbom = json.load(file)
+    with open(file_path, 'rb') as file:
+        # orjson parses straight from the mapped pages, skipping the copy into a bytes buffer
+        if orjson is not None and os.path.getsize(file_path) >= MMAP_THRESHOLD:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                return orjson.loads(view)
+
+        sbom = _loads(file.read())
         # process the SBOM
         return sbom
     
 def parse_sbom_xml(file_path):
-    tree = ET.parse(file_path)
+    parser = ET.XMLParser(remove_blank_text=True, **_XML_OPTIONS) if _XML_OPTIONS else None
+    tree = ET.parse(file_path, parser=parser)
     root = tree.getroot()
     # process the SBOM
     return root
 
-def generate_dependency_tree(sbom):
-    dot = Digraph(comment='Dependency Tree', format='pdf')
-    dot.attr(rankdir='LR', dpi='300')  # High resolution for clarity
+def _build_json_item(events, prefix, event, value):
+    if event not in ('start_map', 'start_array'):
+        return value
+
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    end_event = 'end_map' if event == 'start_map' else 'end_array'
+    # Nested containers have longer prefixes, so the item ends at the first matching end event under its own
+    for current, event, value in events:
+        builder.event(event, value)
+        if current == prefix and event == end_event:
+            break
+    return builder.value
+
+def _iter_json_components(file, dependency_entries=None):
+    if ijson is None:
+        sbom = _loads(file.read())
+        if dependency_entries is not None:
+            dependency_entries.extend(sbom.get('dependencies', []))
+        yield from sbom.get('components', [])
+        return
 
-    # Define a dictionary to hold subgraph clusters
-    clusters = {}
+    # A single event stream over the file; each item is rebuilt from the events under its prefix
+    events = ijson.parse(file)
+    for prefix, event, value in events:
+        if prefix == 'components.item':
+            yield _build_json_item(events, prefix, event, value)
+        elif prefix == 'dependencies.item' and dependency_entries is not None:
+            dependency_entries.append(_build_json_item(events, prefix, event, value))
 
-    # Iterate through the components and their dependencies
-    for component in sbom:
-        if 'name' in component:
-            component_name = component['name']
-            component_version = component.get('version', 'Unknown')
-            component_cluster = component.get('cluster', 'default')  # Assume there is a 'cluster' key
+def validate_components(components, schema_file):
+    """
+    Validate streamed CycloneDX components one at a time against the schema's component definition.
+    Args:
+        components (iterable of dict): CycloneDX components.
+        schema_file (str): Path to the CycloneDX JSON schema.
+    Yields:
+        dict: Each component, after it has been validated.
+    """
+    validator = _compile_schema(schema_file, 'component') if fastjsonschema is not None else None
+    if validator is None:
+        print("Skipping component validation: no compiled validator available")
+        yield from components
+        return
 
-            # If the cluster does not exist, create it
-            if component_cluster not in clusters:
-                clusters[component_cluster] = Digraph(name=f'cluster_{component_cluster}')
-                clusters[component_cluster].attr(label=component_cluster, color='lightgrey')
+    for index, component in enumerate(components):
+        try:
+            validator(component)
+        except fastjsonschema.JsonSchemaException as e:
+            print(f"Validation error in component {index}: {e}")
+        yield component
 
-            # Create a label for the node with the name and version
-            component_label = f"{component_name}\n{component_version}"
+def parse_sbom_json_stream(file_path, dependency_entries=None):
+    """
+    Stream the top-level components of a CycloneDX JSON SBOM.
+    Args:
+        file_path (str): Path to the SBOM file.
+        dependency_entries (list): Optional list that receives the entries of the 'dependencies' section.
+    Yields:
+        Component: Processed dependency for each named component.
+    """
+    with open(file_path, 'rb') as file:
+        for component in _iter_json_components(file, dependency_entries):
+            if component.get('name'):
+                yield project_cyclonedx_component(component)
 
-            # Add the node to the appropriate cluster
-            clusters[component_cluster].node(component_name, label=component_label)
+def stream_sbom_to_csv(sbom_json_path, csv_output_path, schema_file=None):
+    """Convert a CycloneDX JSON SBOM file to a CSV file without loading the whole document.
 
-            # Add edges for dependencies within the same cluster
-            if 'dependencies' in component:
-                for dependency in component['dependencies']:
-                    if 'name' in dependency:
-                        dependency_name = dependency['name']
-                        dependency_version = dependency.get('version', 'Unknown')
-                        edge_label = f"Version: {dependency_version}"
-                        clusters[component_cluster].edge(component_name, dependency_name, label=edge_label)
+    Args:
+        sbom_json_path (str): Path to the SBOM file.
+        csv_output_path (str): The path where the CSV output will be saved.
+        schema_file (str): Optional schema to validate each component against as it is read.
 
-    # Add all clusters to the main graph
-    for cluster in clusters.values():
-        dot.subgraph(cluster)
+    Returns:
+        list of Component: Processed dependencies, collected in the same pass over the file.
+    """
 
-    # Remove global node attributes that override individual settings
-    dot.node_attr.clear()
+    dependencies = []
+    dependency_entries = []
+
+    def components(file):
+        components = _iter_json_components(file, dependency_entries)
+        if schema_file is not None:
+            components = validate_components(components, schema_file)
+        for component in components:
+            if component.get('name'):
+                dependencies.append(project_cyclonedx_component(component))
+            yield component
+
+    with open(sbom_json_path, 'rb') as file:
+        convert_sbom_to_csv(components(file), csv_output_path)
+    link_dependencies(dependencies, dependency_entries)
+    return dependencies
 
-    return dot
+def parse_sbom_xml_stream(file_path, dependency_entries=None):
+    """
+    Stream the top-level components of a CycloneDX XML SBOM.
+    Args:
+        file_path (str): Path to the SBOM file.
+        dependency_entries (list): Optional list that receives the entries of the <dependencies> section.
+    Yields:
+        Component: Processed dependency for each named component.
+    """
+    path = []
+    container = None
+    # --stream is the opt-in for very large SBOMs, so only here are libxml2's depth and text size limits lifted
+    options = dict(_XML_OPTIONS, huge_tree=True) if _XML_OPTIONS else {}
+    for event, elem in ET.iterparse(file_path, events=('start', 'end'), **options):
+        namespace, _, tag = elem.tag.rpartition('}')
+        if event == 'start':
+            if tag in ('components', 'dependencies') and path == ['bom']:
+                container = elem
+            path.append(tag)
+            continue
+
+        path.pop()
+        prefix = namespace + '}' if namespace else ''
+        if tag == 'component' and path == ['bom', 'components']:
+            name = (elem.findtext(f'{prefix}name') or '').strip()
+            if name:
+                yield Component(
+                    type=sys.intern(elem.get('type', 'library')),
+                    name=name,
+                    version=(elem.findtext(f'{prefix}version') or '').strip(),
+                    ref=elem.get('bom-ref', ''),
+                    purl=(elem.findtext(f'{prefix}purl') or '').strip()
+                )
+        elif tag == 'dependency' and path == ['bom', 'dependencies']:
+            if dependency_entries is not None:
+                dependency_entries.append({
+                    'ref': elem.get('ref'),
+                    'dependsOn': [child.get('ref') for child in elem.iterfind(f'{prefix}dependency')]
+                })
+        else:
+            continue
+        # Drop the parsed subtree, and the emptied element itself, so memory stays bounded by one entry
+        elem.clear()
+        container.remove(elem)
 
-def check_all_vulnerabilites(dependencies):
+_STREAM_PARSERS = {'.json': parse_sbom_json_stream, '.xml': parse_sbom_xml_stream}
+
+def parse_sbom_stream(file_path, dependency_entries=None):
+    parser = _STREAM_PARSERS.get(get_file_type(file_path))
+    if parser is None:
+        print("Unsupported file type")
+        return None
+    return parser(file_path, dependency_entries)
+
+def _dot_quote(value):
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'"{escaped}"'
+
+def generate_dependency_tree(sbom):
+    # The DOT source is built as text and handed to graphviz only for rendering
+
+    # Node and edge statements; nodes are listed before edges
+    nodes = []
+    edges = []
+    add_edge = edges.append
+    # Names already emitted as nodes; duplicate components would otherwise repeat them
+    seen = set()
+    # Dependency names and edge labels repeat across components, so escape each distinct string once
+    quoted = {}
+
+    def quote(value):
+        result = quoted.get(value)
+        if result is None:
+            result = quoted[value] = _dot_quote(value)
+        return result
+
+    # Iterate through the components and their dependencies
+    for component in sbom:
+        if component.name:
+            component_name = component.name
+            component_version = component.version or 'Unknown'
+            quoted_name = quote(component_name)
+
+            # Add the node, labelled with the name and version
+            if component_name not in seen:
+                seen.add(component_name)
+                component_label = _dot_quote(f"{component_name}\n{component_version}")
+                nodes.append(f'\t\t{quoted_name} [label={component_label}]')
+
+            # Add edges for dependencies
+            for dependency in component.dependencies:
+                if 'name' in dependency:
+                    edge_label = quote(f"Version: {dependency.get('version', 'Unknown')}")
+                    add_edge(f'\t\t{quoted_name} -> {quote(dependency["name"])} [label={edge_label}]')
+
+    # All components are drawn inside one labelled cluster
+    lines = ['// Dependency Tree', 'digraph {', '\tdpi=300 rankdir=LR']  # High resolution for clarity
+    if nodes:
+        lines.append('\tsubgraph "cluster_default" {')
+        lines.append('\t\tcolor=lightgrey label="default"')
+        lines += nodes
+        lines += edges
+        lines.append('\t}')
+    lines.append('}')
+
+    # Imported here so graphviz is only loaded once there is a tree to render
+    from graphviz import Source
+    return Source('\n'.join(lines) + '\n', format='pdf')
+
+def submit_vulnerability_checks(executor, dependencies):
+    """
+    Start vulnerability lookups for the distinct libraries in dependencies.
+    Args:
+        executor (concurrent.futures.Executor): Executor that runs the lookups.
+        dependencies (list): Processed dependencies.
+    Returns:
+        dict: Pending lookup futures mapped to their (name, version).
+    """
+    # Identical libraries collapse to a single lookup
     libraries_and_versions = {}
     for dep in dependencies:
-        name = dep.get('name')
-        version = dep.get('version')
+        name = dep.name
+        version = dep.version
         if name and version:
-            libraries_and_versions[name] = version
-            check_vulnerabilities(name)
-    print(libraries_and_versions)
+            libraries_and_versions[(name, version)] = None
+    print(list(libraries_and_versions))
+
+    return {executor.submit(check_vulnerabilities, name, version): (name, version)
+            for name, version in libraries_and_versions}
 
+def collect_vulnerabilities(vulnerability_checks):
+    # Gather each lookup as soon as it finishes; main reports the results per dependency
+    vulnerabilities = {}
+    for future in concurrent.futures.as_completed(vulnerability_checks):
+        vulnerabilities[vulnerability_checks[future]] = future.result()
+    return vulnerabilities
+
+def check_all_vulnerabilites(dependencies):
+    # The lookups are network bound, so overlap them instead of waiting on each round trip in turn
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_VULNERABILITY_WORKERS) as executor:
+        return collect_vulnerabilities(submit_vulnerability_checks(executor, dependencies))
+
+def _open_vulnerability_cache():
+    connection = sqlite3.connect(VULNERABILITY_CACHE_FILE, timeout=30)
+    connection.execute('CREATE TABLE IF NOT EXISTS vulnerabilities (key TEXT PRIMARY KEY, result TEXT, expires REAL)')
+    return connection
+
+def _read_vulnerability_cache(key):
+    try:
+        with closing(_open_vulnerability_cache()) as connection:
+            row = connection.execute('SELECT result, expires FROM vulnerabilities WHERE key = ?', (key,)).fetchone()
+    except sqlite3.Error:
+        return None
+
+    if row is not None and row[1] > time.time():
+        return _loads(row[0])
+    return None
+
+def _write_vulnerability_cache(key, result):
+    try:
+        with closing(_open_vulnerability_cache()) as connection, connection:
+            connection.execute('INSERT OR REPLACE INTO vulnerabilities VALUES (?, ?, ?)',
+                               (key, json.dumps(result), time.time() + VULNERABILITY_CACHE_TTL))
+    except sqlite3.Error as e:
+        print(f"Error while caching vulnerabilities for {key}: {e}")
+
+# Bounded so long-running callers checking many SBOMs do not grow the memo without limit
+@functools.lru_cache(maxsize=4096)
+def check_vulnerabilities(library, version=None):
+    key = f"{library}@{version}"
+    cached = _read_vulnerability_cache(key)
+    if cached is not None:
+        return cached
 
-def check_vulnerabilities(library):
     # Make a request to vulnerability database
     try:
-        response = requests.get(f'https://vuldb.com/api/{library}')
+        response = _get_client().get(f'https://vuldb.com/api/{library}', timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
-            # Process the response and extract relevant information
-            # Fornow, just returning the staus code for simplicity
-            return response.status_code
-    except requests.RequestException as e:
-        # Handle exceptions related to the request
+            # Return the vulnerability report itself so it can be cached and shown
+            vulnerabilities = response.json()
+            _write_vulnerability_cache(key, vulnerabilities)
+            return vulnerabilities
+        return {}
+    except _HTTP_ERRORS as e:
+        # Handle exceptions related to the request or an unreadable response body
         print(f"Error while checking vulnerabilities for {library}: {e}")
         return {}
 
-def parse_sbom(file_path, sbom_format):
+@functools.lru_cache(maxsize=None)
+def ensure_schema(sbom_format):
+    """
+    Download the schema for an SBOM format, or revalidate the cached copy, at most once per run.
+    Args:
+        sbom_format (str): The SBOM format, 'cyclonedx' or 'spdx'.
+    Returns:
+        str: Path to the schema file, or None if no copy is available.
+    """
+    schema_file = SCHEMA_FILES[sbom_format]
+    download_result = download_schema(SCHEMA_URLS[sbom_format], schema_file)
+    if not os.path.exists(schema_file):
+        print(f"Failed to download schema: {download_result}")
+        return None
+    if download_result != schema_file:
+        print(f"Unable to refresh schema, using cached '{schema_file}': {download_result}")
+    return schema_file
+
+_PARSERS = {'.json': parse_sbom_json, '.xml': parse_sbom_xml}
+
+def parse_sbom(file_path, sbom_format, schema_download=None):
     file_type = get_file_type(file_path)
-    if file_type == '.json':
-        with open(file_path, 'r') as file:
-            sbom = json.load(file)
-            validate_sbom(sbom, f'schema_{sbom_format}.json') # Assuming you have a corresponding schema file
-            return sbom
-    elif file_type == '.xml':
-        return parse_sbom_xml(file_path)
-    else:
+    parser = _PARSERS.get(file_type)
+    if parser is None:
         print("Unsupported file type")
         return None
 
+    sbom = parser(file_path)
+    if file_type == '.json':
+        # The schema is only needed from here on, so it may still be downloading while the SBOM is read
+        if schema_download is not None:
+            schema_download.result()
+        schema_file = SCHEMA_FILES[sbom_format]
+        if os.path.exists(schema_file):
+            validate_sbom(sbom, schema_file)
+    return sbom
+
 def main():
     parser = argparse.ArgumentParser(description='SBOMVisor is up and running!')
     parser.add_argument('file', help='Path to SBOM file')
     parser.add_argument('format', help='Format of SBOM (e.g., cyclonedx, spdx)',
                         choices=['cyclonedx', 'spdx'])
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream CycloneDX components one at a time instead of loading the whole SBOM')
     args = parser.parse_args()
 
-    schema_file_cyclonedx = "schema_cyclonedx.json"
-    schema_file_spdx = "schema_spdx.json"
-
-    # URL for CycloneDX and SPDX schemas
-    schema_urls = {
-        'cyclonedx':"https://cyclonedx.org/schema/bom-1.5.schema.json",
-        'spdx': "https://raw.githubusercontent.com/spdx/spdx-spec/development/v2.3.1/schemas/spdx-schema.json"
-    }
-
-    # Determine which schema to download based on the format
-    schema_url = schema_urls[args.format]
-    schema_file = schema_file_cyclonedx if args.format == 'cyclonedx' else schema_file_spdx
-
-    # Check if the schema file already exists
-    if not os.path.exists(schema_file):
-        download_result = download_schema(schema_url, schema_file)
+    if args.stream and args.format != 'cyclonedx':
+        parser.error('--stream is only supported for CycloneDX SBOMs')
+
+    csv_output_path = 'sbom_data.csv'
+
+    # Only JSON SBOMs are validated, so XML runs never touch the network for a schema
+    needs_schema = get_file_type(args.file) == '.json'
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        # Download the schema, or revalidate the cached copy, while the SBOM is being read
+        schema_download = executor.submit(ensure_schema, args.format) if needs_schema else None
+
+        if args.stream and needs_schema:
+            # A single pass over the file validates each component, writes the CSV and collects the dependencies.
+            # Every component has to be validated before it is written, so this path waits for the schema
+            # instead of overlapping the download; a cached schema usually costs only a 304 round trip
+            sbom = stream_sbom_to_csv(args.file, csv_output_path, schema_download.result())
+        elif args.stream:
+            # Components are projected as they are parsed, so the full SBOM is never held in memory
+            dependency_entries = []
+            components = parse_sbom_stream(args.file, dependency_entries)
+            sbom = list(components) if components is not None else None
+            if sbom is not None:
+                link_dependencies(sbom, dependency_entries)
+        else:
+            sbom = parse_sbom(args.file, args.format, schema_download)
 
-        if not os.path.exists(schema_file):
-            print(f"Failed to download schema: {download_result}")
+    if needs_schema and ensure_schema(args.format) is None:
         return
-    else:
-        print(f"Schema file '{schema_file}' already exists. Skipping download.")
 
-    sbom = parse_sbom(args.file, args.format)
-    
     if sbom is not None:
         # Pass both sbom and the format to process_sbom
-        dependencies = process_sbom(sbom, args.format)
-        csv_output_path = 'sbom_data.csv'
-        convert_sbom_to_csv(sbom, csv_output_path)
-        print(f"CSV file saved as {csv_output_path}")
-
-        # Check for dependencies and generate dependency tree and vulnerabilities
-        if dependencies:
-            tree = generate_dependency_tree(dependencies)
-            tree.render('dependency_tree.gv', view=True)   
-            
-            check_all_vulnerabilites(dependencies) # Call check_all_vulnerabilites # Saves and closes the dependency tree
-            # Print dependencies to the screen
-            print("Dependencies:")
-            for dependency in dependencies:
-                print(dependency)
-
-            # print("Vulnerabilities Report:", vulnerabilites)
-        else:
-            print("No dependencies found.")
+        dependencies = sbom if args.stream else process_sbom(sbom, args.format)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_VULNERABILITY_WORKERS) as executor:
+            # Start the vulnerability lookups first so their network latency overlaps the CSV and tree work
+            vulnerability_checks = submit_vulnerability_checks(executor, dependencies)
+
+            # Streamed JSON SBOMs already wrote their CSV while being parsed
+            if not args.stream:
+                convert_sbom_to_csv(sbom, csv_output_path)
+            elif get_file_type(args.file) != '.json':
+                convert_sbom_to_csv(map(dataclasses.asdict, sbom), csv_output_path)
+
+            # Check for dependencies and generate dependency tree and vulnerabilities
+            if dependencies:
+                tree = generate_dependency_tree(dependencies)
+                tree.render('dependency_tree.gv', view=True)
+
+                vulnerabilities = collect_vulnerabilities(vulnerability_checks)
+                # Print dependencies to the screen
+                print("Dependencies:")
+                for dependency in dependencies:
+                    print(dependency)
+
+                # Each distinct library was looked up once; report the result against every dependency that uses it
+                print("Vulnerabilities Report:")
+                for dependency in dependencies:
+                    library = (dependency.name, dependency.version)
+                    if library in vulnerabilities:
+                        print(f"{dependency.name} {dependency.version}: {vulnerabilities[library]}")
+            else:
+                print("No dependencies found.")
     else:
         print("Failed to parse SBOM")
 
@@ -1,12 +1,34 @@
 # test_basic.py
+import csv
+import io
 import json
+import os
+import tempfile
 import unittest
+from contextlib import redirect_stdout
 from unittest.mock import patch, MagicMock, mock_open
 import xml.etree.ElementTree as ET
-from src.main import parse_sbom_json, parse_sbom_xml, check_vulnerabilities, process_sbom
+import src.main
+from src.main import parse_sbom_json, parse_sbom_xml, check_vulnerabilities, process_sbom, process_cyclonedx_sbom, convert_sbom_to_csv, generate_dependency_tree, Component, download_schema, link_dependencies, parse_sbom_json_stream, parse_sbom_xml_stream, stream_sbom_to_csv, validate_components, validate_sbom
+
+def _streamed_response(**attributes):
+    # Streamed requests responses are used as context managers
+    response = MagicMock(**attributes)
+    response.__enter__.return_value = response
+    return response
 
 class TestSBOMProcessing(unittest.TestCase):
 
+    def setUp(self):
+        # Keep vulnerability lookups away from the repo's on-disk cache and from each other
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        cache_patch = patch('src.main.VULNERABILITY_CACHE_FILE', os.path.join(tmp_dir.name, 'vuln_cache.sqlite'))
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+        check_vulnerabilities.cache_clear()
+        self.addCleanup(check_vulnerabilities.cache_clear)
+
     def test_parse_sbom_json(self):
         with open('bom.json', 'r') as file:
             mock_data = file.read()
@@ -43,7 +65,8 @@ class TestSBOMProcessing(unittest.TestCase):
 '''
 
         # Use the actual bom.xml for parsing or mock it if you are not using a real file
-        with patch("xml.etree.ElementTree.parse") as mock_parse:
+        # Patch the module main actually parses with, which is lxml when it is installed
+        with patch("src.main.ET.parse") as mock_parse:
             mock_parse.return_value.getroot.return_value = ET.fromstring(mock_xml_data)
             sbom = parse_sbom_xml('bom.xml')
     
@@ -52,24 +75,65 @@ class TestSBOMProcessing(unittest.TestCase):
         self.assertIsNotNone(sbom.find('{http://cyclonedx.org/schema/bom/1.2}components'))
         # Add more assertions based on expected content of bom.xml
 
+    def test_parse_sbom_xml_stream(self):
+        xml_data = '''<bom xmlns="http://cyclonedx.org/schema/bom/1.2">
+    <components>
+        <component type="library" bom-ref="a">
+            <name>Library A</name>
+            <version>1.0</version>
+            <components><component type="library"><name>Nested</name></component></components>
+        </component>
+        <component type="framework" bom-ref="b"><name>Library B</name><version>2.0</version></component>
+    </components>
+    <dependencies>
+        <dependency ref="a"><dependency ref="b"/></dependency>
+    </dependencies>
+</bom>'''
+
+        # Record every parsed element so the tree can be inspected once the stream is exhausted
+        iterparse = src.main.ET.iterparse
+        elements = []
+
+        def recording_iterparse(*args, **kwargs):
+            for event, elem in iterparse(*args, **kwargs):
+                elements.append(elem)
+                yield event, elem
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            sbom_path = os.path.join(tmp_dir, 'bom.xml')
+            with open(sbom_path, 'w') as file:
+                file.write(xml_data)
+            dependency_entries = []
+            with patch('src.main.ET.iterparse', recording_iterparse):
+                components = list(parse_sbom_xml_stream(sbom_path, dependency_entries))
+
+        self.assertEqual([(c.name, c.version, c.type, c.ref) for c in components],
+                         [('Library A', '1.0', 'library', 'a'), ('Library B', '2.0', 'framework', 'b')])
+        self.assertEqual(dependency_entries, [{'ref': 'a', 'dependsOn': ['b']}])
+        # Each processed entry was removed from its container, so neither keeps the streamed subtrees
+        root = elements[0]
+        self.assertEqual([len(container) for container in root], [0, 0])
+
     def test_generate_dependency_tree(self):
         # Prepare sample SBOM data (replace with your actual data structure)
         sample_sbom = [
-            {
-                'name': 'Library A',
-                'version': '1.0',
-                'dependencies': [
+            Component(
+                type='library',
+                name='Library A',
+                version='1.0',
+                dependencies=[
                     {'name': 'Library B'},
                     {'name': 'Library C'},
                 ]
-            },
-            {
-                'name': 'Library B',
-                'version': '2.0',
-                'dependencies': [
+            ),
+            Component(
+                type='library',
+                name='Library B',
+                version='2.0',
+                dependencies=[
                     {'name': 'Library D'},
                 ]
-            },
+            ),
         ]
 
         # Call the generate_dependency_tree function with the sample data
@@ -77,12 +141,13 @@ class TestSBOMProcessing(unittest.TestCase):
 
         # Add assertions to check if the generated tree matches your expectations
         # For example, you can check if specific nodes and edges exist:
-        self.assertTrue(dependency_tree.node('Library A'))
-        self.assertTrue(dependency_tree.node('Library B'))
-        self.assertTrue(dependency_tree.edge('Library A', 'Library B'))
+        self.assertIn('"Library A" [label="Library A\\n1.0"]', dependency_tree.source)
+        self.assertIn('"Library B" [label="Library B\\n2.0"]', dependency_tree.source)
+        self.assertIn('"Library A" -> "Library B"', dependency_tree.source)
 
-    @patch('requests.get')
-    def test_check_vulnerabilities(self, mock_get):
+    @patch('src.main._get_client')
+    def test_check_vulnerabilities(self, mock_client):
+        mock_get = mock_client.return_value.get
         # Example response from a vulnerability check
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -90,10 +155,52 @@ class TestSBOMProcessing(unittest.TestCase):
         mock_get.return_value = mock_response
 
         vulnerabilities = check_vulnerabilities("library1")
-        mock_get.assert_called_with('https://vulndb.com/api/library1')
+        mock_get.assert_called_with('https://vuldb.com/api/library1', timeout=5)
         self.assertIn("vulnerabilities", vulnerabilities)
         self.assertEqual(vulnerabilities["vulnerabilities"][0]["id"], "CVE-1234")
 
+    @unittest.skipIf(src.main.httpx is None, 'httpx[http2] is not installed')
+    def test_check_vulnerabilities_over_http2_client(self):
+        httpx = src.main.httpx
+        seen_requests = []
+
+        def handler(request):
+            seen_requests.append(request)
+            return httpx.Response(200, json={"vulnerabilities": [{"id": "CVE-1234"}]})
+
+        with patch('src.main._http2_client', None), \
+                patch('src.main.httpx.HTTPTransport', return_value=httpx.MockTransport(handler)) as transport:
+            vulnerabilities = check_vulnerabilities("library1", "1.0")
+            client = src.main._http2_client
+        self.addCleanup(client.close)
+
+        transport.assert_called_once_with(
+            http2=True, retries=3, limits=httpx.Limits(max_connections=src.main.MAX_VULNERABILITY_WORKERS))
+        self.assertEqual([str(request.url) for request in seen_requests], ['https://vuldb.com/api/library1'])
+        self.assertEqual(vulnerabilities, {"vulnerabilities": [{"id": "CVE-1234"}]})
+
+    @patch('src.main._get_client')
+    def test_check_vulnerabilities_uses_disk_cache(self, mock_client):
+        mock_get = mock_client.return_value.get
+        mock_get.return_value = MagicMock(status_code=200)
+        mock_get.return_value.json.return_value = {"vulnerabilities": []}
+
+        # Miss: the lookup goes to the network and is stored
+        self.assertEqual(check_vulnerabilities("library1", "1.0"), {"vulnerabilities": []})
+        self.assertEqual(mock_get.call_count, 1)
+
+        # Hit: a fresh process (empty memo) reads the stored result
+        check_vulnerabilities.cache_clear()
+        self.assertEqual(check_vulnerabilities("library1", "1.0"), {"vulnerabilities": []})
+        self.assertEqual(mock_get.call_count, 1)
+
+        # Expired: past the TTL the lookup goes to the network again
+        check_vulnerabilities.cache_clear()
+        expired = src.main.time.time() + src.main.VULNERABILITY_CACHE_TTL + 1
+        with patch('src.main.time.time', return_value=expired):
+            check_vulnerabilities("library1", "1.0")
+        self.assertEqual(mock_get.call_count, 2)
+
     def test_process_sbom(self):
         # You might need to parse your bom.json or bom.xml first to pass as an argument to process_sbom
         with open('bom.json', 'r') as file:
@@ -113,5 +220,224 @@ class TestSBOMProcessing(unittest.TestCase):
 
         # Add more assertions based on expected content of dependencies
 
+    def test_process_cyclonedx_sbom_links_dependencies(self):
+        sbom = {
+            'components': [
+                {'bom-ref': 'pkg:npm/a@1.0', 'name': 'Library A', 'version': '1.0'},
+                {'bom-ref': 'pkg:npm/b@2.0', 'name': 'Library B', 'version': '2.0'},
+            ],
+            'dependencies': [
+                {'ref': 'pkg:npm/a@1.0', 'dependsOn': ['pkg:npm/b@2.0', 'pkg:npm/c@3.0']},
+            ]
+        }
+
+        dependencies = process_cyclonedx_sbom(sbom)
+
+        self.assertEqual(len(dependencies), 2)
+        self.assertEqual(dependencies[0].dependencies, [
+            {'name': 'Library B', 'version': '2.0'},
+            {'name': 'pkg:npm/c@3.0'},
+        ])
+        self.assertEqual(dependencies[1].dependencies, [])
+
+    def test_process_cyclonedx_sbom_defaults_missing_type(self):
+        sbom = {'components': [{'name': 'Library A', 'type': None}, {'name': 'Library B', 'type': 7}]}
+
+        dependencies = process_cyclonedx_sbom(sbom)
+
+        self.assertEqual([d.type for d in dependencies], ['library', 'library'])
+
+    def test_parse_sbom_json_stream_links_dependencies(self):
+        sbom = {
+            'components': [
+                {'bom-ref': 'a', 'name': 'Library A', 'version': '1.0'},
+                {'bom-ref': 'b', 'name': 'Library B', 'version': '2.0'},
+            ],
+            'dependencies': [{'ref': 'a', 'dependsOn': ['b']}]
+        }
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            sbom_path = os.path.join(tmp_dir, 'bom.json')
+            with open(sbom_path, 'w') as file:
+                json.dump(sbom, file)
+
+            dependency_entries = []
+            dependencies = list(parse_sbom_json_stream(sbom_path, dependency_entries))
+            link_dependencies(dependencies, dependency_entries)
+
+        self.assertEqual(dependency_entries, sbom['dependencies'])
+        self.assertEqual(dependencies[0].dependencies, [{'name': 'Library B', 'version': '2.0'}])
+
+    def test_convert_sbom_to_csv(self):
+        sbom = {
+            'components': [
+                {
+                    'type': 'library',
+                    'name': 'Library A',
+                    'version': '1.0',
+                    'description': 'First library',
+                    'licenses': [{'license': {'id': 'MIT'}}, {'license': {'name': 'Custom'}}]
+                },
+                {'type': 'library', 'name': 'Library B', 'version': '2.0'},
+            ]
+        }
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_output_path = os.path.join(tmp_dir, 'sbom_data.csv')
+            convert_sbom_to_csv(sbom, csv_output_path)
+            with open(csv_output_path, newline='') as file:
+                rows = list(csv.DictReader(file))
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['licenses'], 'MIT,Custom')
+        self.assertEqual(rows[1]['description'], '')
+
+    def test_stream_sbom_to_csv(self):
+        sbom = {
+            'components': [
+                {'type': 'library', 'bom-ref': 'a', 'name': 'Library A', 'version': '1.0',
+                 'licenses': [{'license': {'id': 'MIT'}}]},
+                {'type': 'library', 'version': '0.1'},
+                {'type': 'framework', 'bom-ref': 'b', 'name': 'Library B', 'version': '2.0'},
+            ],
+            'dependencies': [{'ref': 'a', 'dependsOn': ['b']}]
+        }
+
+        # Once through ijson and once through the full-load fallback
+        for streaming_parser in (src.main.ijson, None):
+            with self.subTest(ijson=streaming_parser is not None), \
+                    patch('src.main.ijson', streaming_parser), tempfile.TemporaryDirectory() as tmp_dir:
+                sbom_path = os.path.join(tmp_dir, 'bom.json')
+                with open(sbom_path, 'w') as file:
+                    json.dump(sbom, file)
+                csv_output_path = os.path.join(tmp_dir, 'sbom_data.csv')
+
+                dependencies = stream_sbom_to_csv(sbom_path, csv_output_path)
+                with open(csv_output_path, newline='') as file:
+                    rows = list(csv.DictReader(file))
+
+                self.assertEqual([(c.name, c.version, c.type) for c in dependencies],
+                                 [('Library A', '1.0', 'library'), ('Library B', '2.0', 'framework')])
+                self.assertEqual(dependencies[0].dependencies, [{'name': 'Library B', 'version': '2.0'}])
+                self.assertEqual([(row['name'], row['version'], row['licenses']) for row in rows],
+                                 [('Library A', '1.0', 'MIT'), ('', '0.1', ''), ('Library B', '2.0', '')])
+
+    @unittest.skipIf(src.main.fastjsonschema is None, 'fastjsonschema is not installed')
+    def test_validate_components(self):
+        schema = {
+            '$schema': 'http://json-schema.org/draft-07/schema#',
+            'type': 'object',
+            'definitions': {
+                'component': {
+                    'type': 'object',
+                    'required': ['type', 'name'],
+                    'properties': {'type': {'enum': ['library', 'framework']}}
+                }
+            }
+        }
+        components = [
+            {'type': 'library', 'name': 'Library A'},
+            {'type': 'unknown', 'name': 'Library B'},
+            {'type': 'library'},
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            schema_file = os.path.join(tmp_dir, 'schema_cyclonedx.json')
+            with open(schema_file, 'w') as file:
+                json.dump(schema, file)
+
+            output = io.StringIO()
+            with redirect_stdout(output):
+                validated = list(validate_components(iter(components), schema_file))
+
+        # Invalid components are reported but still passed on
+        self.assertEqual(validated, components)
+        errors = [line for line in output.getvalue().splitlines() if line.startswith('Validation error')]
+        self.assertEqual(len(errors), 2)
+        self.assertIn('component 1', errors[0])
+        self.assertIn('component 2', errors[1])
+        self.assertIn('name', errors[1])
+
+    @patch('src.main.fastjsonschema', None)
+    def test_validate_sbom_skips_unresolvable_refs(self):
+        schema = {'$schema': 'http://json-schema.org/draft-07/schema#', '$ref': 'urn:example:missing'}
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            schema_file = os.path.join(tmp_dir, 'schema_cyclonedx.json')
+            with open(schema_file, 'w') as file:
+                json.dump(schema, file)
+
+            output = io.StringIO()
+            with redirect_stdout(output):
+                validate_sbom({'components': []}, schema_file)
+
+        self.assertIn('Skipping validation', output.getvalue())
+
+    def test_convert_xml_sbom_to_csv(self):
+        xml_data = '''<bom xmlns="http://cyclonedx.org/schema/bom/1.2">
+    <metadata><component type="application"><name>Sample Project</name></component></metadata>
+    <components>
+        <component type="library">
+            <name>Library A</name>
+            <version>1.0</version>
+            <licenses><license><id>MIT</id></license><expression>Apache-2.0 OR MIT</expression></licenses>
+        </component>
+    </components>
+</bom>'''
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            sbom_path = os.path.join(tmp_dir, 'bom.xml')
+            with open(sbom_path, 'w') as file:
+                file.write(xml_data)
+            csv_output_path = os.path.join(tmp_dir, 'sbom_data.csv')
+            convert_sbom_to_csv(parse_sbom_xml(sbom_path), csv_output_path)
+            with open(csv_output_path, newline='') as file:
+                rows = list(csv.DictReader(file))
+
+        self.assertEqual(rows, [{
+            'name': 'Library A', 'version': '1.0', 'type': 'library', 'description': '',
+            'licenses': 'MIT,Apache-2.0 OR MIT'
+        }])
+
+    @patch('src.main._get_session')
+    def test_download_schema_revalidates_with_etag(self, mock_session):
+        mock_get = mock_session.return_value.get
+        downloaded = _streamed_response(status_code=200, raw=io.BytesIO(b'{}'), headers={'ETag': '"v1"'})
+        mock_get.return_value = downloaded
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            schema_file = os.path.join(tmp_dir, 'schema_cyclonedx.json')
+            self.assertEqual(download_schema('https://example.com/schema.json', schema_file), schema_file)
+
+            not_modified = _streamed_response(status_code=304)
+            mock_get.return_value = not_modified
+            self.assertEqual(download_schema('https://example.com/schema.json', schema_file), schema_file)
+            mock_get.assert_called_with('https://example.com/schema.json', headers={'If-None-Match': '"v1"'}, stream=True, timeout=5)
+
+            with open(schema_file) as file:
+                self.assertEqual(file.read(), '{}')
+
+        # Both streamed responses were closed, so their connections went back to the pool
+        downloaded.__exit__.assert_called_once()
+        not_modified.__exit__.assert_called_once()
+
+    @patch('src.main._get_session')
+    def test_download_schema_removes_partial_file(self, mock_session):
+        raw = MagicMock()
+        raw.read.side_effect = OSError('connection reset')
+        mock_session.return_value.get.return_value = _streamed_response(status_code=200, raw=raw, headers={})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            schema_file = os.path.join(tmp_dir, 'schema_cyclonedx.json')
+            with open(schema_file, 'w') as file:
+                file.write('{}')
+
+            result = download_schema('https://example.com/schema.json', schema_file)
+
+            self.assertEqual(result, 'Error: connection reset')
+            self.assertEqual(os.listdir(tmp_dir), ['schema_cyclonedx.json'])
+            with open(schema_file) as file:
+                self.assertEqual(file.read(), '{}')
+
 if __name__ == '__main__':
     unittest.main()